@@ -1,26 +1,41 @@
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import eva_gen
+from eva_gen.common.front_end.lexer import ParseError
+from eva_gen.common.front_end.parser import Parser
 
 
 def path_of_string(s: str):
     return Path(s).resolve()
 
 
+def parse_one(path: Path):
+    return Parser(path.read_text()).parse()
+
+
 def setup():
     parser = ArgumentParser(description=eva_gen.__doc__)
     parser.add_argument(
         "-S", action="store_true", default=False, help="Output EVA assembly"
     )
-    parser.add_argument("input", type=path_of_string, help="Input file")
+    parser.add_argument(
+        "input", nargs="+", type=path_of_string, help="Input files"
+    )
     parser.add_argument("-o", metavar="output", type=path_of_string, help="Output file")
     return parser
 
 
 def main():
     args = setup().parse_args()
-    print(repr(args))
+    with ProcessPoolExecutor() as executor:
+        futures = [(path, executor.submit(parse_one, path)) for path in args.input]
+        for path, future in futures:
+            try:
+                print(future.result())
+            except ParseError as error:
+                print(f"{path}:\n{error}")
 
 
 if __name__ == "__main__":
@@ -1,10 +1,9 @@
 import abc
 import typing
-from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 from typing import Any, List
 
-from ..front_end.lexer import LineCol
+from ..front_end.lexer import TOK
 
 Visitor = typing.Callable[["BaseNode"], Any]
 ExprNode = typing.Union[
@@ -16,79 +15,138 @@ ExprNode = typing.Union[
 ]
 
 
-class BinaryOperation(Enum):
-    ADD = "+"
-    SUB = "-"
-    MULT = "*"
-    DIV = "/"
-    POWER = "**"
-    AND = "and"
-    OR = "or"
+class BinaryOperation(IntEnum):
+    ADD = 0
+    SUB = 1
+    MULT = 2
+    DIV = 3
+    POWER = 4
+    AND = 5
+    OR = 6
 
 
-class UnaryOperation(Enum):
-    PRINT = "print"
-    NOT = "not"
+BINOP_SYMBOL = ("+", "-", "*", "/", "**", "and", "or")
 
 
-@dataclass
-class Span:
-    start: LineCol
-    end: LineCol
+class UnaryOperation(IntEnum):
+    PRINT = 0
+    NOT = 1
+
+
+UNOP_SYMBOL = ("print", "not")
+
+
+# Byte offsets (start, end) into the source; line/col come lazily from
+# Lexer.linecol_from_position when a span is actually reported.
+Span = typing.Tuple[int, int]
+
+
+NUMBER_PARSERS = {
+    TOK.NUMBER_DEC: float,
+    TOK.NUMBER_HEX: lambda v: int(v, 16),
+    TOK.NUMBER_OCT: lambda v: int(v, 8),
+}
+
+
+_INDENTS = [""]
+
+
+def _indent(n: int) -> str:
+    while len(_INDENTS) <= n:
+        _INDENTS.append(_INDENTS[-1] + "  ")
+    return _INDENTS[n]
+
+
+def walk(root: "BaseNode", visitor: Visitor):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        visitor(node)
+        stack.extend(node._children())
 
 
 class BaseNode(abc.ABC):
+    __slots__ = ("span",)
+
     def __init__(self, span: Span):
         self.span = span
 
     def visit(self, visitor: Visitor):
-        visitor(self)
+        walk(self, visitor)
+
+    def _children(self) -> typing.Tuple["BaseNode", ...]:
+        return ()
+
+    def _attrs(self):
+        return tuple(
+            name
+            for cls in reversed(type(self).__mro__)
+            for name in getattr(cls, "__slots__", ())
+        )
 
     def __eq__(self, other):
         if type(self) is type(other):
-            return self.__dict__ == other.__dict__
+            return all(getattr(self, a) == getattr(other, a) for a in self._attrs())
         return NotImplemented
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({repr(self.__dict__)}"
+        attrs = ", ".join(f"{a}={getattr(self, a)!r}" for a in self._attrs())
+        return f"{self.__class__.__name__}({attrs})"
+
+    def display(self, n: int) -> str:
+        buf = []
+        self._dump(buf, n)
+        return "".join(buf)
 
     @abc.abstractmethod
-    def display(self, n: int):
+    def _dump(self, buf: typing.List[str], n: int):
         pass
 
     def __str__(self):
-        return f"{self.display(0)}"
+        return self.display(0)
 
 
 class DeclarationNode(BaseNode):
+    __slots__ = ("ident",)
+
     def __init__(self, span: Span, ident: str):
         super().__init__(span)
         self.ident = ident
 
-    def display(self, n: int):
-        return f"{n*'  '}var {self.ident}\n"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}var {self.ident}\n")
 
 
 class AssignmentNode(BaseNode):
+    __slots__ = ("ident", "expr")
+
     def __init__(self, span: Span, ident: str, expr: ExprNode):
         super().__init__(span)
         self.ident = ident
         self.expr = expr
 
-    def display(self, n: int):
-        return f"{n * '  '}var {self.ident} =\n{self.expr.display(n + 1)}"
+    def _children(self):
+        return (self.expr,)
+
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}var {self.ident} =\n")
+        self.expr._dump(buf, n + 1)
 
 
 class ValueNode(BaseNode):
-    def __init__(self, span: Span, value: str):
+    __slots__ = ("value",)
+
+    def __init__(self, span: Span, value: str, kind: int = TOK.NUMBER_DEC):
         super().__init__(span)
-        self.value = float(value)
+        self.value = NUMBER_PARSERS[kind](value)
 
-    def display(self, n: int):
-        return f"{n*'  '}{self.value}\n"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}{self.value}\n")
 
 
 class BinaryOperationNode(BaseNode):
+    __slots__ = ("left", "op", "right")
+
     def __init__(
         self, span: Span, left: ExprNode, op: BinaryOperation, right: ExprNode
     ):
@@ -97,81 +155,93 @@ class BinaryOperationNode(BaseNode):
         self.op = op
         self.right = right
 
-    def visit(self, visitor: Visitor):
-        visitor(self.left)
-        visitor(self.right)
-        super().visit(visitor)
+    def _children(self):
+        return self.left, self.right
 
-    def display(self, n):
-        return f"{n*'  '}{self.op}\n{self.left.display(n+1)}{self.right.display(n+1)}"
+    def _dump(self, buf, n):
+        buf.append(f"{_indent(n)}{BINOP_SYMBOL[self.op]}\n")
+        self.left._dump(buf, n + 1)
+        self.right._dump(buf, n + 1)
 
 
 class UnaryOperationNode(BaseNode):
+    __slots__ = ("op", "operand")
+
     def __init__(self, span: Span, op: UnaryOperation, operand: ExprNode):
         super().__init__(span)
         self.op = op
         self.operand = operand
 
-    def visit(self, visitor: Visitor):
-        visitor(self.operand)
-        super().visit(visitor)
+    def _children(self):
+        return (self.operand,)
 
-    def display(self, n: int):
-        return f"{n*'  '}{self.op}\n{self.operand.display(n+1)}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}{UNOP_SYMBOL[self.op]}\n")
+        self.operand._dump(buf, n + 1)
 
 
 class ReturnStatementNode(BaseNode):
+    __slots__ = ("expr",)
+
     def __init__(self, span: Span, expr: ExprNode):
         super().__init__(span)
         self.expr = expr
 
-    def visit(self, visitor: Visitor):
-        visitor(self.expr)
-        super().visit(visitor)
+    def _children(self):
+        return (self.expr,)
 
-    def display(self, n: int):
-        return f"{n*'  '}return\n{self.expr.display(n+1)}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}return\n")
+        self.expr._dump(buf, n + 1)
 
 
 class CodeBlockNode(BaseNode):
+    __slots__ = ("block",)
+
     def __init__(self, span: Span, block: typing.List[BaseNode]):
         super().__init__(span)
         self.block = block
 
-    def visit(self, visitor: Visitor):
-        [visitor(b) for b in self.block]
-        super().visit(visitor)
+    def _children(self):
+        return tuple(self.block)
 
-    def display(self, n: int):
-        s = "".join(node.display(n + 1) for node in self.block)
-        return f"{n*'  '}block\n{s}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}block\n")
+        for node in self.block:
+            node._dump(buf, n + 1)
 
 
 class WhileNode(BaseNode):
+    __slots__ = ("condition", "block")
+
     def __init__(self, span: Span, cond: ExprNode, block: CodeBlockNode):
         super().__init__(span)
         self.condition = cond
         self.block = block
 
-    def visit(self, visitor: Visitor):
-        visitor(self.condition)
-        visitor(self.block)
-        super().visit(visitor)
+    def _children(self):
+        return self.condition, self.block
 
-    def display(self, n: int):
-        return f"{n*'  '}while\n{self.condition.display(n+1)}{self.block.display(n+1)}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}while\n")
+        self.condition._dump(buf, n + 1)
+        self.block._dump(buf, n + 1)
 
 
 class IdentNode(BaseNode):
+    __slots__ = ("ident",)
+
     def __init__(self, span: Span, ident: str):
         super().__init__(span)
         self.ident = ident
 
-    def display(self, n: int):
-        return f"{n * '  '}{self.ident}\n"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}{self.ident}\n")
 
 
 class FunctionNode(BaseNode):
+    __slots__ = ("name", "args", "block")
+
     def __init__(
         self, span: Span, name: str, args: List[ExprNode], code: CodeBlockNode
     ):
@@ -180,40 +250,41 @@ class FunctionNode(BaseNode):
         self.args = args
         self.block = code
 
-    def visit(self, visitor: Visitor):
-        for arg in self.args:
-            visitor(arg)
-        visitor(self.block)
-        super().visit(visitor)
+    def _children(self):
+        return (*self.args, self.block)
 
-    def display(self, n: int):
-        return f"{n * '  '}function {self.name}(nargs={len(self.args)})\n{self.block.display(n + 1)}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}function {self.name}(nargs={len(self.args)})\n")
+        self.block._dump(buf, n + 1)
 
 
 class ExternFunctionNode(BaseNode):
+    __slots__ = ("name", "args")
+
     def __init__(self, span: Span, name: str, args: List[ExprNode]):
         super().__init__(span)
         self.name = name
         self.args = args
 
-    def display(self, n: int):
-        return f"{n * '  '}extern function {self.name}(nargs={len(self.args)})\n"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}extern function {self.name}(nargs={len(self.args)})\n")
 
-    def visit(self, visitor: Visitor):
-        [visitor(arg) for arg in self.args]
-        super().visit(visitor)
+    def _children(self):
+        return tuple(self.args)
 
 
 class FunctionCallNode(BaseNode):
+    __slots__ = ("ident", "args")
+
     def __init__(self, span: Span, ident: str, args: List[ExprNode]):
         super().__init__(span)
         self.ident = ident
         self.args = args
 
-    def visit(self, visitor: Visitor):
-        [visitor(a) for a in self.args]
-        super().visit(visitor)
+    def _children(self):
+        return tuple(self.args)
 
-    def display(self, n: int):
-        s = "".join(node.display(n + 1) for node in self.args)
-        return f"{n*'  '}call {self.ident}\n{s}"
+    def _dump(self, buf: typing.List[str], n: int):
+        buf.append(f"{_indent(n)}call {self.ident}\n")
+        for node in self.args:
+            node._dump(buf, n + 1)
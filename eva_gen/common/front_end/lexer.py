@@ -1,96 +1,159 @@
 import re
+from bisect import bisect_right
 from collections import namedtuple
 from typing import Dict, AnyStr, Tuple, Pattern, Iterator
 
 TokenSpec = Dict[str, Pattern]
-Token = Tuple[str, str]
+Token = Tuple[int, str]
 LineCol = namedtuple("LineCol", "line col")
 
 
 class ParseError(Exception):
-    def __init__(self, message: AnyStr, line: str, position: LineCol):
-        line_str = str(position.line)
-        caret = ' ' * (position.col + len(line_str)) + '^'
-        super().__init__(f"{message}\n{line_str}| {line}\n{caret}")
+    def __init__(self, message: AnyStr, code: AnyStr, position: LineCol):
+        super().__init__(message, code, position)
+        self.message = message
+        self.code = code
         self.position = position
 
+    def __str__(self):
+        line = self.code.split("\n")[self.position.line - 1]
+        line_str = str(self.position.line)
+        caret = ' ' * (self.position.col + len(line_str)) + '^'
+        return f"{self.message}\n{line_str}| {line}\n{caret}"
+
 
 TOKENS: TokenSpec = {
-    "UNOP": re.compile("not"),
-    "BIN_POWER": re.compile(r"\*\*"),
-    "BIN_MULT": re.compile(r"\*"),
-    "BIN_DIV": re.compile(r"/"),
-    "BIN_ADD": re.compile(r"\+"),
-    "BIN_SUB": re.compile(r"-"),
-    "KW_VAR": re.compile(r"var"),
-    "KW_FUN": re.compile(r"fun"),
-    "KW_WHILE": re.compile(r"while"),
-    "KW_RETURN": re.compile(r"return"),
-    "KW_EXTERN": re.compile("extern"),
     "IDENT": re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*"),
-    "NUMBER": re.compile(r"([0-9]+(\.[0-9]+)?|0x[0-9A-F]+|0o[0-7]+)"),
-    "EQUALS": re.compile(r"="),
-    "LESSTHAN": re.compile(r"<"),
-    "LESSEQUAL": re.compile(r"<="),
-    "GREATERTHAN": re.compile(r">"),
-    "GREATEREQUAL": re.compile(r">="),
-    "LEFT_PARENT": re.compile(r"\("),
-    "RIGHT_PARENT": re.compile(r"\)"),
-    "LEFT_BRACE": re.compile(r"{"),
-    "RIGHT_BRACE": re.compile(r"}"),
-    "COMMA": re.compile(r","),
+    "NUMBER_HEX": re.compile(r"0x[0-9A-Fa-f]+"),
+    "NUMBER_OCT": re.compile(r"0o[0-7]+"),
+    "NUMBER_DEC": re.compile(r"[0-9]+(?:\.[0-9]+)?"),
     "_IGNORE": re.compile(r"[ \t\n]+"),
 }
 
+MASTER = re.compile("|".join(f"(?P<{k}>{v.pattern})" for k, v in TOKENS.items()))
+
+DOUBLE_CHARS = {
+    "**": "BIN_POWER",
+    "<=": "LESSEQUAL",
+    ">=": "GREATEREQUAL",
+}
+
+SINGLE_CHARS = {
+    "*": "BIN_MULT",
+    "/": "BIN_DIV",
+    "+": "BIN_ADD",
+    "-": "BIN_SUB",
+    "=": "EQUALS",
+    "<": "LESSTHAN",
+    ">": "GREATERTHAN",
+    "(": "LEFT_PARENT",
+    ")": "RIGHT_PARENT",
+    "{": "LEFT_BRACE",
+    "}": "RIGHT_BRACE",
+    ",": "COMMA",
+}
+
+WHITESPACE = " \t\n"
+
+KEYWORDS = {
+    "not": "UNOP",
+    "var": "KW_VAR",
+    "fun": "KW_FUN",
+    "while": "KW_WHILE",
+    "return": "KW_RETURN",
+    "extern": "KW_EXTERN",
+}
+
+TOKEN_NAMES = (
+    *TOKENS,
+    *DOUBLE_CHARS.values(),
+    *SINGLE_CHARS.values(),
+    *KEYWORDS.values(),
+    "_EOI",
+)
+
+TOK = type("TOK", (), {name: i for i, name in enumerate(TOKEN_NAMES)})
+
+GROUP_KINDS = {name: getattr(TOK, name) for name in TOKENS}
+DOUBLE_CHARS = {chars: getattr(TOK, name) for chars, name in DOUBLE_CHARS.items()}
+SINGLE_CHARS = {char: getattr(TOK, name) for char, name in SINGLE_CHARS.items()}
+KEYWORDS = {word: getattr(TOK, name) for word, name in KEYWORDS.items()}
+
 
 class Lexer(Iterator[Token]):
     def __init__(self, code: AnyStr):
         self.code = code
-        self.rest = code
         self.position = 0
+        self._line = 1
+        self._col = 1
+        self._line_starts = [0]
+        for i, c in enumerate(code):
+            if c == "\n":
+                self._line_starts.append(i + 1)
 
     def __next__(self) -> Token:
-        if len(self.rest) == 0:
-            raise StopIteration
-        go_again = True
-        while go_again:
-            go_again = False
-            for k, v in TOKENS.items():
-                m = v.match(self.rest)
-                if m and m.start(0) == 0:
-                    self.rest = self.rest[m.end(0):]
-                    self.position = len(self.code) - len(self.rest)
-                    if k == "_IGNORE":
-                        go_again = True
-                        break
-                    return k, m.group(0)
-        if len(self.rest) == 0:
-            raise StopIteration
-        raise ParseError(f"Cannot lex input code", self.cur_line, self.linecol)
+        code = self.code
+        length = len(code)
+        pos = self.position
+        whitespace = WHITESPACE
+        double_chars = DOUBLE_CHARS
+        single_chars = SINGLE_CHARS
+        match = MASTER.match
+        while pos < length:
+            c = code[pos]
+            if c in whitespace:
+                pos += 1
+                if c == "\n":
+                    self._line += 1
+                    self._col = 1
+                else:
+                    self._col += 1
+                continue
+            pair = code[pos:pos + 2]
+            if pair in double_chars:
+                self.position = pos + 2
+                self._col += 2
+                return double_chars[pair], pair
+            if c in single_chars:
+                self.position = pos + 1
+                self._col += 1
+                return single_chars[c], c
+            m = match(code, pos)
+            if not m:
+                self.position = pos
+                raise ParseError(f"Cannot lex input code", code, self.linecol)
+            pos = m.end(0)
+            text = m.group(0)
+            nl = text.count("\n")
+            if nl:
+                self._line += nl
+                self._col = len(text) - text.rfind("\n")
+            else:
+                self._col += len(text)
+            kind = GROUP_KINDS[m.lastgroup]
+            if kind == TOK._IGNORE:
+                continue
+            self.position = pos
+            if kind == TOK.IDENT:
+                kind = KEYWORDS.get(text, TOK.IDENT)
+            return kind, text
+        self.position = pos
+        raise StopIteration
 
     def linecol_from_position(self, position: int) -> LineCol:
-        curpos = 0
-        lines = self.code.split("\n")
-        for i, line in enumerate(lines):
-            if curpos + len(line) >= position:
-                line = i + 1
-                col = position - curpos + 1
-                return LineCol(line, col)
-            else:
-                curpos += len(line)
-        line = len(lines)
-        col = len(lines[-1])
-        return LineCol(line, col)
+        i = bisect_right(self._line_starts, position) - 1
+        return LineCol(i + 1, position - self._line_starts[i] + 1)
 
     @property
     def linecol(self) -> LineCol:
-        return self.linecol_from_position(self.position)
+        return LineCol(self._line, self._col)
 
     def get_line(self, lineno: int) -> str:
-        for i, line in enumerate(self.code.split("\n")):
-            if i + 1 == lineno:
-                return line
-        raise ValueError(f"Bad line number: {lineno}")
+        starts = self._line_starts
+        if not 1 <= lineno <= len(starts):
+            raise ValueError(f"Bad line number: {lineno}")
+        end = starts[lineno] - 1 if lineno < len(starts) else len(self.code)
+        return self.code[starts[lineno - 1]:end]
 
     @property
     def cur_line(self) -> str:
@@ -1,219 +1,199 @@
 from typing import Union
 
-from common.ast.nodes import *
-from common.front_end.lexer import Token, Lexer, ParseError
+from ..ast.nodes import *
+from .lexer import TOK, TOKEN_NAMES, Token, Lexer, ParseError
+
+PRECEDENCE = {
+    TOK.BIN_ADD: (1, BinaryOperation.ADD, True),
+    TOK.BIN_SUB: (1, BinaryOperation.SUB, True),
+    TOK.BIN_MULT: (2, BinaryOperation.MULT, True),
+    TOK.BIN_DIV: (2, BinaryOperation.DIV, True),
+    TOK.BIN_POWER: (3, BinaryOperation.POWER, False),
+}
+
+TOKEN_TO_UNOP = {
+    TOK.UNOP: UnaryOperation.NOT,
+}
 
 
 class Parser:
-    def __init__(self, code: Union[str, Lexer], incomplete=False):
-        if isinstance(code, Lexer):
-            self.lexer = code
-        else:
-            self.lexer = Lexer(code)
-        if incomplete:
-            self.token = next(self.lexer)
-        else:
-            self.token: Token = "_SOI", ""
+    def __init__(self, code: Union[str, Lexer]):
+        self.lexer = code if isinstance(code, Lexer) else Lexer(code)
+        try:
+            self.token: Token = next(self.lexer)
+        except StopIteration:
+            self.token: Token = TOK._EOI, ""
 
     @property
     def position(self):
         return self.lexer.linecol
 
+    @property
+    def offset(self) -> int:
+        return self.lexer.position
+
     @property
     def code(self):
         return self.lexer.code
 
     def parse(self) -> CodeBlockNode:
-        start = self.position
-        self.eat("_SOI")
+        start = self.offset
 
         def gen():
-            while not self.is_next("_EOI"):
+            while not self.is_next(TOK._EOI):
                 yield self.parse_function()
 
         block = list(gen())
-        self.eat("_EOI")
-        return CodeBlockNode(Span(start, self.position), block)
+        self.eat(TOK._EOI)
+        return CodeBlockNode((start, self.offset), block)
 
-    def peek(self) -> str:
+    def peek(self) -> int:
         return self.token[0]
 
-    def eat(self, token: str) -> str:
+    def eat(self, token: int) -> str:
         cur_token = self.peek()
         if cur_token == token:
             value = self.token[1]
             try:
                 self.token = next(self.lexer)
             except StopIteration:
-                self.token = "_EOI", ""
+                self.token = TOK._EOI, ""
             return value
-        if cur_token == "_EOI":
+        if cur_token == TOK._EOI:
             raise ParseError(
-                f"Unexpected end of file, expecting {token}", self.lexer.cur_line, self.position)
+                f"Unexpected end of file, expecting {TOKEN_NAMES[token]}", self.lexer.code, self.position)
         raise ParseError(
-            f"Unexpected token {self.token[0]}, expecting {token}", self.lexer.cur_line, self.position)
+            f"Unexpected token {TOKEN_NAMES[self.token[0]]}, expecting {TOKEN_NAMES[token]}", self.lexer.code, self.position)
 
-    def is_next(self, token: str) -> bool:
+    def is_next(self, token: int) -> bool:
         return self.peek() == token
 
-    def accept(self, token: str) -> bool:
+    def accept(self, token: int) -> bool:
         if self.is_next(token):
             self.eat(token)
             return True
         return False
 
     def parse_function(self) -> BaseNode:
-        start = self.position
-        is_extern = self.accept("KW_EXTERN")
-        if self.accept("KW_FUN"):
-            name = self.eat("IDENT")
-            self.eat("LEFT_PARENT")
+        start = self.offset
+        is_extern = self.accept(TOK.KW_EXTERN)
+        if self.accept(TOK.KW_FUN):
+            name = self.eat(TOK.IDENT)
+            self.eat(TOK.LEFT_PARENT)
             args = self.parse_comma_list()
-            self.eat("RIGHT_PARENT")
+            self.eat(TOK.RIGHT_PARENT)
             if not is_extern:
                 code = self.parse_codeblock(force=True)
-                return FunctionNode(Span(start, self.position), name, args, code)
+                return FunctionNode((start, self.offset), name, args, code)
             else:
-                return ExternFunctionNode(Span(start, self.position), name, args)
+                return ExternFunctionNode((start, self.offset), name, args)
         return self.parse_codeblock()
 
     def parse_codeblock(self, force=False) -> CodeBlockNode:
-        start = self.position
-        if self.accept("LEFT_BRACE"):
+        start = self.offset
+        if self.accept(TOK.LEFT_BRACE):
 
             def gen():
-                while not self.is_next("RIGHT_BRACE"):
+                while not self.is_next(TOK.RIGHT_BRACE):
                     yield self.parse_statement()
 
             block = list(gen())
-            self.eat("RIGHT_BRACE")
+            self.eat(TOK.RIGHT_BRACE)
         else:
             if force:
                 raise ParseError(f"Code block need braces",
-                                 self.lexer.cur_line, self.position)
+                                 self.lexer.code, self.position)
             block = [self.parse_declaration()]
-        return CodeBlockNode(Span(start, self.position), block)
+        return CodeBlockNode((start, self.offset), block)
 
     def parse_statement(self) -> BaseNode:
-        start = self.position
-        if self.accept("KW_RETURN"):
+        start = self.offset
+        if self.accept(TOK.KW_RETURN):
             expr = self.parse_expression()
-            return ReturnStatementNode(Span(start, self.position), expr)
-        if self.accept("KW_WHILE"):
+            return ReturnStatementNode((start, self.offset), expr)
+        if self.accept(TOK.KW_WHILE):
             cond = self.parse_expression()
             block = self.parse_codeblock()
-            return WhileNode(Span(start, self.position), cond, block)
+            return WhileNode((start, self.offset), cond, block)
         return self.parse_declaration()
 
     def parse_declaration(self) -> BaseNode:
-        start = self.position
-        if self.accept("KW_VAR"):
-            ident = self.eat("IDENT")
-            return DeclarationNode(Span(start, self.position), ident)
+        start = self.offset
+        if self.accept(TOK.KW_VAR):
+            ident = self.eat(TOK.IDENT)
+            return DeclarationNode((start, self.offset), ident)
         return self.parse_assignment()
 
     def parse_assignment(self) -> BaseNode:
-        start = self.position
+        start = self.offset
         left = self.parse_expression()
-        if self.accept("EQUALS"):
+        if self.accept(TOK.EQUALS):
             if not isinstance(left, IdentNode):
                 raise ParseError(
-                    "Syntax error", self.lexer.cur_line, self.position)
+                    "Syntax error", self.lexer.code, self.position)
             expr = self.parse_expression()
-            return AssignmentNode(Span(start, self.position), left.ident, expr)
+            return AssignmentNode((start, self.offset), left.ident, expr)
         return left
 
     def parse_expression(self) -> ExprNode:
-        if self.accept("LEFT_PARENT"):
-            e = self.parse_expression()
-            self.eat("RIGHT_PARENT")
-            return e
-
-        return self.parse_expr_add()
+        return self.parse_binop(1)
 
-    def parse_expr_add(self) -> ExprNode:
-        start = self.position
-        left = self.parse_expr_sub()
-        if self.accept("BIN_ADD"):
-            right = self.parse_expr_add()
-            return BinaryOperationNode(Span(start, self.position), left, BinaryOperation.ADD, right)
-        return left
-
-    def parse_expr_sub(self) -> ExprNode:
-        start = self.position
-        left = self.parse_expr_mult()
-        if self.accept("BIN_SUB"):
-            right = self.parse_expr_add()
-            return BinaryOperationNode(Span(start, self.position), left, BinaryOperation.SUB, right)
-        return left
-
-    def parse_expr_mult(self) -> ExprNode:
-        start = self.position
-        left = self.parse_expr_div()
-        if self.accept("BIN_MULT"):
-            right = self.parse_expr_mult()
-            return BinaryOperationNode(Span(start, self.position), left, BinaryOperation.MULT, right)
-        return left
-
-    def parse_expr_div(self) -> ExprNode:
-        start = self.position
-        left = self.parse_expr_power()
-        if self.accept("BIN_DIV"):
-            right = self.parse_expr_mult()
-            return BinaryOperationNode(Span(start, self.position), left, BinaryOperation.DIV, right)
-        return left
-
-    def parse_expr_power(self):
-        start = self.position
+    def parse_binop(self, min_prec: int) -> ExprNode:
+        start = self.offset
         left = self.parse_function_call()
-        if self.accept("BIN_POWER"):
-            right = self.parse_expr_power()
-            return BinaryOperationNode(Span(start, self.position), left, BinaryOperation.POWER, right)
-        return left
+        while True:
+            entry = PRECEDENCE.get(self.peek())
+            if entry is None or entry[0] < min_prec:
+                return left
+            prec, op, left_assoc = entry
+            self.eat(self.peek())
+            right = self.parse_binop(prec + 1 if left_assoc else prec)
+            left = BinaryOperationNode((start, self.offset), left, op, right)
 
     def parse_function_call(self) -> ExprNode:
-        start = self.position
+        start = self.offset
         left = self.parse_expr_unary()
-        if self.accept("LEFT_PARENT"):
+        if self.accept(TOK.LEFT_PARENT):
             if not isinstance(left, IdentNode):
                 raise ParseError(
-                    "Syntax error", self.lexer.cur_line, self.position)
-            args = self.parse_comma_list("RIGHT_PARENT")
-            self.eat("RIGHT_PARENT")
-            return FunctionCallNode(Span(start, self.position), left.ident, args)
+                    "Syntax error", self.lexer.code, self.position)
+            args = self.parse_comma_list(TOK.RIGHT_PARENT)
+            self.eat(TOK.RIGHT_PARENT)
+            return FunctionCallNode((start, self.offset), left.ident, args)
         return left
 
     def parse_expr_unary(self) -> ExprNode:
-        start = self.position
-        if self.is_next("UNOP"):
-            op = self.eat("UNOP")
+        start = self.offset
+        if self.is_next(TOK.UNOP):
+            self.eat(TOK.UNOP)
             operand = self.parse_function_call()
-            return UnaryOperationNode(Span(start, self.position), UnaryOperation(op), operand)
+            return UnaryOperationNode((start, self.offset), TOKEN_TO_UNOP[TOK.UNOP], operand)
         return self.parse_parent_expr()
 
     def parse_parent_expr(self):
-        if self.accept("LEFT_PARENT"):
+        if self.accept(TOK.LEFT_PARENT):
             e = self.parse_expression()
-            self.eat("RIGHT_PARENT")
+            self.eat(TOK.RIGHT_PARENT)
             return e
         return self.parse_value()
 
     def parse_value(self) -> ExprNode:
-        start = self.position
-        if self.is_next("NUMBER"):
-            value = self.eat("NUMBER")
-            return ValueNode(Span(start, self.position), value)
-        if self.is_next("IDENT"):
-            ident = self.eat("IDENT")
-            return IdentNode(Span(start, self.position), ident)
+        start = self.offset
+        kind = self.peek()
+        if kind in NUMBER_PARSERS:
+            value = self.eat(kind)
+            return ValueNode((start, self.offset), value, kind)
+        if self.is_next(TOK.IDENT):
+            ident = self.eat(TOK.IDENT)
+            return IdentNode((start, self.offset), ident)
         raise ParseError(
-            "Syntax error", self.lexer.get_line(start.line), start)
+            "Syntax error", self.lexer.code, self.lexer.linecol_from_position(start))
 
-    def parse_comma_list(self, close_token="RIGHT_PARENT"):
+    def parse_comma_list(self, close_token=TOK.RIGHT_PARENT):
         if self.is_next(close_token):
             return list()
         args = [self.parse_expression()]
-        while self.accept("COMMA"):
+        while self.accept(TOK.COMMA):
             args.append(self.parse_expression())
 
         return args